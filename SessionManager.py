@@ -1,21 +1,42 @@
-import uuid
+import heapq
+import secrets
+import time
 import threading
-from concurrent.futures import as_completed, Future, ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
+from functools import lru_cache
 from logging import basicConfig, getLogger, INFO
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Dict, List, Set
 
 basicConfig(level=INFO)
 logger = getLogger(__name__)
 
-try:
-    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
-except Exception as e:
-    logger.error(f"Failed to import from streamlit.runtime.scriptrunner: {e}")
-    add_script_run_ctx = None
-    get_script_run_ctx = None
+_SCRIPT_RUN_CTX_HELPERS = None
+
+def get_script_run_ctx_helpers():
+    """
+    Import the Streamlit script-run context helpers on first use and cache them.
+
+    The streamlit.runtime.scriptrunner import pulls in a sizeable dependency graph, so it is
+    deferred until a download thread actually needs the context and skipped entirely in
+    headless contexts.
+
+    Returns:
+        tuple: (add_script_run_ctx, get_script_run_ctx), both None if streamlit is unavailable.
+    """
+
+    global _SCRIPT_RUN_CTX_HELPERS
+    if _SCRIPT_RUN_CTX_HELPERS is None:
+        try:
+            from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+            _SCRIPT_RUN_CTX_HELPERS = (add_script_run_ctx, get_script_run_ctx)
+        except Exception as e:
+            logger.error(f"Failed to import from streamlit.runtime.scriptrunner: {e}")
+            _SCRIPT_RUN_CTX_HELPERS = (None, None)
+    return _SCRIPT_RUN_CTX_HELPERS
 
 class DownloadStatus(Enum):
     """
@@ -38,7 +59,31 @@ class SessionStatus(Enum):
     PENDING = "pending"
     RUNNING = "running"
 
-@dataclass
+ACTIVE_SESSION_STATUSES: frozenset = frozenset({SessionStatus.PENDING, SessionStatus.RUNNING})
+DOWNLOAD_STATUS_VALUES: Dict[DownloadStatus, str] = {status: status.value for status in DownloadStatus}
+PENDING_DOWNLOAD_STATUSES: frozenset = frozenset({DownloadStatus.QUEUED, DownloadStatus.DOWNLOADING})
+SESSION_STATUS_VALUES: Dict[SessionStatus, str] = {status: status.value for status in SessionStatus}
+TERMINAL_DOWNLOAD_STATUSES: frozenset = frozenset({DownloadStatus.COMPLETED, DownloadStatus.FAILED})
+TERMINAL_SESSION_STATUSES: frozenset = frozenset({SessionStatus.COMPLETED, SessionStatus.CANCELLED})
+
+@lru_cache(maxsize=4096)
+def cached_isoformat(timestamp: datetime) -> str:
+    """
+    Format a datetime as an ISO 8601 string, caching the result.
+
+    Timestamps on items and sessions are written once but serialised on every UI poll,
+    so the formatted string is memoised instead of being rebuilt per call.
+
+    Parameters:
+        timestamp (datetime): The timestamp to format.
+
+    Returns:
+        str: The ISO 8601 representation of the timestamp.
+    """
+
+    return timestamp.isoformat()
+
+@dataclass(slots=True)
 class DownloadItem:
     """
     Data model representing a downloadable item with its metadata, progress, and status.
@@ -48,6 +93,7 @@ class DownloadItem:
         error_message (str): Error details if the download failed.
         file_path (str): Path to the downloaded file.
         id (str): Unique identifier of the download item.
+        lock (threading.Lock): Lock guarding mutations of this item only.
         metadata (Dict[str, Any]): Additional metadata related to the download.
         name (str): Human-readable name of the download item.
         progress (float): Progress of the download expressed as a fraction (0.0-100.0).
@@ -62,6 +108,7 @@ class DownloadItem:
     completed_at: datetime = None
     error_message: str = None
     file_path: str = None
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
     metadata: Dict[str, Any] = field(default_factory=dict)
     progress: float = 0.0
     started_at: datetime = None
@@ -75,18 +122,18 @@ class DownloadItem:
             Dict[str, Any]: Dictionary containing the attributes of the download item.
         """
 
-        return {"completed_at": self.completed_at.isoformat() if self.completed_at else None,
+        return {"completed_at": cached_isoformat(self.completed_at) if self.completed_at else None,
                 "error_message": self.error_message,
                 "file_path": self.file_path,
                 "id": self.id,
                 "metadata": self.metadata,
                 "name": self.name,
                 "progress": self.progress,
-                "started_at": self.started_at.isoformat() if self.started_at else None,
-                "status": self.status.value,
+                "started_at": cached_isoformat(self.started_at) if self.started_at else None,
+                "status": DOWNLOAD_STATUS_VALUES[self.status],
                 "url": self.url}
 
-@dataclass
+@dataclass(slots=True)
 class DownloadSession:
     """
     Data model representing a session that manages multiple downloads.
@@ -95,8 +142,12 @@ class DownloadSession:
         completed_at (datetime): Timestamp when the session completed.
         completed_items (int): Number of successfully completed downloads.
         created_at (datetime): Timestamp when the session was created.
+        created_monotonic (float): Monotonic clock reading taken at creation, used for cheap expiry checks.
         downloads (List[DownloadItem]): List of download items in the session.
+        downloading_items (int): Number of downloads currently in progress.
+        downloads_by_id (Dict[str, DownloadItem]): Index of download items keyed by item ID.
         failed_items (int): Number of failed downloads.
+        lock (threading.Lock): Lock guarding status transitions of this session.
         metadata (Dict[str, Any]): Additional metadata related to the session.
         name (str): Human-readable name of the session.
         session_id (str): Unique identifier of the session.
@@ -110,8 +161,12 @@ class DownloadSession:
     completed_at: datetime = None
     completed_items: int = 0
     created_at: datetime = field(default_factory=datetime.now)
+    created_monotonic: float = field(default_factory=time.monotonic, repr=False, compare=False)
+    downloading_items: int = 0
     downloads: List[DownloadItem] = field(default_factory=list)
+    downloads_by_id: Dict[str, DownloadItem] = field(default_factory=dict, repr=False, compare=False)
     failed_items: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
     metadata: Dict[str, Any] = field(default_factory=dict)
     started_at: datetime = None
     status: SessionStatus = field(default=SessionStatus.PENDING)
@@ -126,8 +181,22 @@ class DownloadSession:
         """
 
         self.downloads.append(item)
-        self.total_items = len(self.downloads)
-        logger.info(f"Added download item {item.name} with item ID {item.id} to session {self.session_id}.")
+        self.downloads_by_id[item.id] = item
+        self.total_items += 1
+        logger.debug("Added download item %s with item ID %s to session %s.", item.name, item.id, self.session_id)
+
+    def add_downloads(self, items: List[DownloadItem]) -> None:
+        """
+        Add a batch of download items to the session in one registration.
+
+        Parameters:
+            items (List[DownloadItem]): The download items to add.
+        """
+
+        self.downloads.extend(items)
+        self.downloads_by_id.update((item.id, item) for item in items)
+        self.total_items += len(items)
+        logger.info("Added %d download items to session %s.", len(items), self.session_id)
 
     def get_progress_summary(self) -> Dict[str, Any]:
         """
@@ -137,24 +206,24 @@ class DownloadSession:
             Dict[str, Any]: Dictionary containing counts, progress, and status of the session.
         """
 
-        completed = sum(1 for download in self.downloads if download.status == DownloadStatus.COMPLETED)
-        failed = sum(1 for download in self.downloads if download.status == DownloadStatus.FAILED)
-        downloading = sum(1 for download in self.downloads if download.status == DownloadStatus.DOWNLOADING)
+        completed = self.completed_items
+        failed = self.failed_items
+        downloading = self.downloading_items
         overall_progress = (completed + failed) / self.total_items * 100 if self.total_items > 0 else 0
-        logger.info(f"Session {self.session_id} progress summary: " 
-                    f"completed={completed}, failed={failed}, downloading={downloading}, total={self.total_items}")
+        logger.debug("Session %s progress summary: completed=%d, failed=%d, downloading=%d, total=%d",
+                     self.session_id, completed, failed, downloading, self.total_items)
 
-        return {"completed_at": self.completed_at.isoformat() if self.completed_at else None,
+        return {"completed_at": cached_isoformat(self.completed_at) if self.completed_at else None,
                 "completed_items": completed,
-                "created_at": self.created_at.isoformat(),
+                "created_at": cached_isoformat(self.created_at),
                 "downloading_items": downloading,
                 "failed_items": failed,
                 "name": self.name,
                 "overall_progress": overall_progress,
                 "queued_items": self.total_items - completed - failed - downloading,
                 "session_id": self.session_id,
-                "started_at": self.started_at.isoformat() if self.started_at else None,
-                "status": self.status.value,
+                "started_at": cached_isoformat(self.started_at) if self.started_at else None,
+                "status": SESSION_STATUS_VALUES[self.status],
                 "total_items": self.total_items}
 
     def to_dict(self) -> Dict[str, Any]:
@@ -165,16 +234,16 @@ class DownloadSession:
             Dict[str, Any]: Dictionary containing the attributes of the session.
         """
 
-        return {"completed_at": self.completed_at.isoformat() if self.completed_at else None,
+        return {"completed_at": cached_isoformat(self.completed_at) if self.completed_at else None,
                 "completed_items": self.completed_items,
-                "created_at": self.created_at.isoformat(),
+                "created_at": cached_isoformat(self.created_at),
                 "downloads": [download.to_dict() for download in self.downloads],
                 "failed_items": self.failed_items,
                 "metadata": self.metadata,
                 "name": self.name,
                 "session_id": self.session_id,
-                "started_at": self.started_at.isoformat() if self.started_at else None,
-                "status": self.status.value,
+                "started_at": cached_isoformat(self.started_at) if self.started_at else None,
+                "status": SESSION_STATUS_VALUES[self.status],
                 "total_items": self.total_items}
 
 class SessionManager:
@@ -191,23 +260,31 @@ class SessionManager:
         Initialize the SessionManager with session control parameters and internal state tracking.
 
         Attributes:
-            _cleanup_lock (threading.Lock): Lock to prevent concurrent cleanup operations.
-            active_futures (Dict[str, List[Future]]): Tracks active future objects for ongoing session tasks.
+            _active_session_ids (Set[str]): IDs of sessions that are currently pending or running.
+            _cleanup_interval_seconds (float): Minimum time between expired-session sweeps.
+            _expiry_heap (List[tuple]): Min-heap of (expiry monotonic time, session_id) pairs.
+            _last_cleanup_monotonic (float): Monotonic clock reading of the last sweep.
+            _status_counts (Dict[SessionStatus, int]): Live count of sessions per status.
+            active_futures (Dict[str, Set[Future]]): Tracks still-running future objects for ongoing session tasks.
+            cancel_events (Dict[str, threading.Event]): Shared cancellation token per session, checked by workers.
             max_concurrent_sessions (int): Maximum number of sessions allowed to run concurrently (default 1).
             sessions (Dict[str, DownloadSession]): Dictionary to store all sessions by their session ID.
-            session_locks (Dict[str, threading.Lock]): Locks to synchronize access for each session.
             session_timeout (timedelta): Time duration after which a session is considered expired (default 60 minutes).
-        
+
         Parameters:
             max_concurrent_sessions (int): Optional maximum concurrent sessions (default 1).
             session_timeout_minutes (int): Optional timeout for session expiration in minutes (default 60).
         """
 
-        self._cleanup_lock = threading.Lock()
-        self.active_futures: Dict[str, List[Future]] = {}
+        self._active_session_ids: Set[str] = set()
+        self._cleanup_interval_seconds: float = 60.0
+        self._expiry_heap: List[tuple] = []
+        self._last_cleanup_monotonic: float = 0.0
+        self._status_counts: Dict[SessionStatus, int] = {status: 0 for status in SessionStatus}
+        self.active_futures: Dict[str, Set[Future]] = {}
+        self.cancel_events: Dict[str, threading.Event] = {}
         self.max_concurrent_sessions = max_concurrent_sessions
         self.sessions: Dict[str, DownloadSession] = {}
-        self.session_locks: Dict[str, threading.Lock] = {}
         self.session_timeout = timedelta(minutes=session_timeout_minutes)
 
     def _cleanup_expired_sessions(self) -> None:
@@ -215,19 +292,22 @@ class SessionManager:
         Remove sessions that have expired due to timeout.
         """
         
-        with self._cleanup_lock:
-            current_time = datetime.now()
-            expired_sessions = []
-            logger.info(f"Running session cleanup at {current_time}")
-            
-            for session_id, session in self.sessions.items():
-                session_age = current_time - session.created_at
-                if session_age > self.session_timeout:
-                    expired_sessions.append(session_id)
-                    logger.info(f"Session {session_id} expired due to timeout. Age: {session_age}")
-            
-            for session_id in expired_sessions:
-                self.cleanup_session(session_id)
+        current_monotonic = time.monotonic()
+        if current_monotonic - self._last_cleanup_monotonic < self._cleanup_interval_seconds:
+            return
+        self._last_cleanup_monotonic = current_monotonic
+
+        expired_sessions = []
+        logger.info(f"Running session cleanup at {datetime.now()}")
+
+        while self._expiry_heap and self._expiry_heap[0][0] <= current_monotonic:
+            expires_at, session_id = heapq.heappop(self._expiry_heap)
+            if session_id in self.sessions:
+                expired_sessions.append(session_id)
+                logger.info(f"Session {session_id} expired due to timeout.")
+
+        for session_id in expired_sessions:
+            self.cleanup_session(session_id)
     
     def _get_active_sessions_count(self) -> int:
         """
@@ -237,8 +317,24 @@ class SessionManager:
             int: Number of active sessions.
         """
 
-        return len([session for session in self.sessions.values() 
-                   if session.status in [SessionStatus.PENDING, SessionStatus.RUNNING]])
+        return len(self._active_session_ids)
+
+    def _record_status_change(self, session_id: str, old_status: SessionStatus, new_status: SessionStatus) -> None:
+        """
+        Keep the live status counters and the active-session set in step with a status transition.
+
+        Parameters:
+            session_id (str): The ID of the session whose status changed.
+            old_status (SessionStatus): Status before the transition.
+            new_status (SessionStatus): Status after the transition.
+        """
+
+        self._status_counts[old_status] -= 1
+        self._status_counts[new_status] += 1
+        if new_status in ACTIVE_SESSION_STATUSES:
+            self._active_session_ids.add(session_id)
+        else:
+            self._active_session_ids.discard(session_id)
 
     def cancel_session(self, session_id: str) -> bool:
         """
@@ -255,54 +351,86 @@ class SessionManager:
             logger.warning(f"Attempted to cancel non-existent session {session_id}")
             return False
         
-        with self.session_locks[session_id]:
-            session = self.sessions[session_id]
-            if session.status in [SessionStatus.COMPLETED, SessionStatus.CANCELLED]:
-                logger.info(f"Session {session_id} is already {session.status}. Skipping cancellation.")
-                return False
-            
-            if session_id in self.active_futures:
-                for future in self.active_futures[session_id]:
-                    future.cancel()
-                logger.info(f"All active futures for session {session_id} have been cancelled.")
-            
-            session.status = SessionStatus.CANCELLED
-            session.completed_at = datetime.now()
-            logger.info(f"Session {session_id} marked as CANCELLED at {session.completed_at}")
-            
-            for item in session.downloads:
-                if item.status in [DownloadStatus.QUEUED, DownloadStatus.DOWNLOADING]:
+        session = self.sessions[session_id]
+        with session.lock:
+            return self._cancel_session_locked(session_id, session)
+
+    def _cancel_session_locked(self, session_id: str, session: DownloadSession) -> bool:
+        """
+        Cancel a session and fail its active downloads. The caller must hold the session lock.
+
+        Each item is checked and failed under its own item lock so a worker completing the item
+        concurrently via `update_download_item` cannot be counted twice; the lock order is always
+        session lock then item lock, and the update path takes only the item lock.
+
+        Parameters:
+            session_id (str): The ID of the session to cancel.
+            session (DownloadSession): The session being cancelled.
+
+        Returns:
+            bool: True if the cancellation was applied, False if the session was already terminal.
+        """
+
+        if session.status in TERMINAL_SESSION_STATUSES:
+            logger.info(f"Session {session_id} is already {session.status}. Skipping cancellation.")
+            return False
+
+        cancel_event = self.cancel_events.get(session_id)
+        if cancel_event:
+            cancel_event.set()
+            logger.info(f"Cancellation signalled to workers of session {session_id}.")
+
+        self._record_status_change(session_id, session.status, SessionStatus.CANCELLED)
+        session.status = SessionStatus.CANCELLED
+        session.completed_at = datetime.now()
+        logger.info(f"Session {session_id} marked as CANCELLED at {session.completed_at}")
+
+        cancelled_at = datetime.now()
+        cancelled_items = 0
+        for item in session.downloads:
+            with item.lock:
+                if item.status in PENDING_DOWNLOAD_STATUSES:
+                    if item.status == DownloadStatus.DOWNLOADING:
+                        session.downloading_items -= 1
                     item.status = DownloadStatus.FAILED
                     item.error_message = "Session cancelled"
                     if not item.completed_at:
-                        item.completed_at = datetime.now()
-                    logger.info(f"item {item.id} {item.name} in session {session_id} marked as FAILED due to session cancellation.")
-            
-            return True
-    
+                        item.completed_at = cancelled_at
+                    cancelled_items += 1
+                    logger.debug("item %s %s in session %s marked as FAILED due to session cancellation.",
+                                 item.id, item.name, session_id)
+        session.failed_items += cancelled_items
+
+        return True
+
     def cleanup_session(self, session_id: str) -> bool:
         """
         Remove a session and its related resources from management after cancelling it.
 
+        Cancellation and deregistration happen under one acquisition of the session lock, so no
+        other thread can observe the session as cancelled but still registered.
+
         Parameters:
             session_id (str): The ID of the session to cleanup.
 
         Returns:
             bool: True if cleanup was successful, False if session was not found.
         """
-        
-        if session_id not in self.sessions:
+
+        session = self.sessions.get(session_id)
+        if session is None:
             logger.warning(f"Attempted to cleanup non-existent session {session_id}")
             return False
-        
-        self.cancel_session(session_id)
-        
-        with self._cleanup_lock:
+
+        with session.lock:
+            self._cancel_session_locked(session_id, session)
             self.sessions.pop(session_id, None)
-            self.session_locks.pop(session_id, None)
+            self._status_counts[session.status] -= 1
+            self._active_session_ids.discard(session_id)
             self.active_futures.pop(session_id, None)
-            logger.info(f"Session {session_id} and its resources have been cleaned up.")
-        
+            self.cancel_events.pop(session_id, None)
+        logger.info(f"Session {session_id} and its resources have been cleaned up.")
+
         return True
 
     def create_session(self, name: str, metadata: Dict[str, Any] = None) -> DownloadSession:
@@ -338,8 +466,12 @@ class SessionManager:
                                   metadata=metadata or {})
         
         self.sessions[session_id] = session
-        self.session_locks[session_id] = threading.Lock()
-        self.active_futures[session_id] = []
+        self.active_futures[session_id] = set()
+        self.cancel_events[session_id] = threading.Event()
+        heapq.heappush(self._expiry_heap, (session.created_monotonic + self.session_timeout.total_seconds(),
+                                           session_id))
+        self._status_counts[SessionStatus.PENDING] += 1
+        self._active_session_ids.add(session_id)
 
         logger.info(f"Created new session {session_id} with name {name}")
         return session
@@ -352,7 +484,7 @@ class SessionManager:
             str: A new unique session ID.
         """
 
-        return str(uuid.uuid4()).replace('-', '')
+        return secrets.token_hex(16)
     
     def get_all_sessions(self) -> List[DownloadSession]:
         """
@@ -372,8 +504,8 @@ class SessionManager:
             List[DownloadSession]: List of active sessions.
         """
 
-        return [session for session in self.sessions.values() 
-                if session.status in [SessionStatus.PENDING, SessionStatus.RUNNING]]
+        return [self.sessions[session_id] for session_id in self._active_session_ids
+                if session_id in self.sessions]
     
     def get_session(self, session_id: str) -> DownloadSession:
         """
@@ -405,10 +537,7 @@ class SessionManager:
             'active_sessions': active_count,
             'max_concurrent_sessions': self.max_concurrent_sessions,
             'session_timeout_minutes': self.session_timeout.total_seconds() / 60,
-            'sessions_by_status': {
-                status.value: len([session for session in self.sessions.values() if session.status == status])
-                for status in SessionStatus
-            }
+            'sessions_by_status': {SESSION_STATUS_VALUES[status]: count for status, count in self._status_counts.items()}
         }
     
     def update_download_item(self, session_id: str, item_id: str, 
@@ -419,6 +548,9 @@ class SessionManager:
         """
         Update the status, progress, error message, or file path of a download item within a session.
 
+        Progress-only updates skip the item lock: the assignment is a single GIL-atomic attribute
+        write and cannot disturb the status counters.
+
         Parameters:
             session_id (str): The session ID containing the download item.
             item_id (str): The ID of the download item to update.
@@ -428,32 +560,46 @@ class SessionManager:
             file_path (str): File path of the completed download.
         """
         
-        if session_id in self.sessions:
-            with self.session_locks[session_id]:
-                session = self.sessions[session_id]
-                for item in session.downloads:
-                    if item.id == item_id:
-                        if status:
-                            item.status = status
-                            if status == DownloadStatus.DOWNLOADING and not item.started_at:
-                                item.started_at = datetime.now()
-                            elif status in [DownloadStatus.COMPLETED, DownloadStatus.FAILED]:
-                                item.completed_at = datetime.now()
-                                logger.info(f"Updated status for item {item.id} {item.name} in session {session_id} to {status.value}")
-                        if progress is not None:
-                            item.progress = progress
-                            logger.info(f"Updated progress for item {item.id} {item.name} in session {session_id} to {progress}")
-                        if error_message is not None:
-                            item.error_message = error_message
-                            logger.info(f"Set error message for item {item.id} {item.name} in session {session_id}: {error_message}")
-                        if file_path is not None:
-                            item.file_path = file_path
-                            logger.info(f"Set file path for item {item.id} {item.name} in session {session_id}: {file_path}")
-                        break
-                
-                session.completed_items = sum(1 for download in session.downloads if download.status == DownloadStatus.COMPLETED)
-                session.failed_items = sum(1 for download in session.downloads if download.status == DownloadStatus.FAILED)
-                logger.info(f"Session {session_id} statistics updated: completed_items={session.completed_items}, failed_items={session.failed_items}")
+        session = self.sessions.get(session_id)
+        if session:
+            item = session.downloads_by_id.get(item_id)
+            if item:
+                if status is None and error_message is None and file_path is None:
+                    if progress is not None:
+                        item.progress = progress
+                    return
+                with item.lock:
+                    if status:
+                        old_status = item.status
+                        item.status = status
+                        if status == DownloadStatus.DOWNLOADING and not item.started_at:
+                            item.started_at = datetime.now()
+                        elif status in TERMINAL_DOWNLOAD_STATUSES:
+                            item.completed_at = datetime.now()
+                            logger.debug("Updated status for item %s %s in session %s to %s",
+                                         item.id, item.name, session_id, status.value)
+                        if old_status != status:
+                            session.completed_items += ((status == DownloadStatus.COMPLETED)
+                                                        - (old_status == DownloadStatus.COMPLETED))
+                            session.downloading_items += ((status == DownloadStatus.DOWNLOADING)
+                                                          - (old_status == DownloadStatus.DOWNLOADING))
+                            session.failed_items += ((status == DownloadStatus.FAILED)
+                                                     - (old_status == DownloadStatus.FAILED))
+                    if progress is not None:
+                        item.progress = progress
+                        logger.debug("Updated progress for item %s %s in session %s to %s",
+                                     item.id, item.name, session_id, progress)
+                    if error_message is not None:
+                        item.error_message = error_message
+                        logger.debug("Set error message for item %s %s in session %s: %s",
+                                     item.id, item.name, session_id, error_message)
+                    if file_path is not None:
+                        item.file_path = file_path
+                        logger.debug("Set file path for item %s %s in session %s: %s",
+                                     item.id, item.name, session_id, file_path)
+
+            logger.debug("Session %s statistics updated: completed_items=%d, failed_items=%d",
+                         session_id, session.completed_items, session.failed_items)
     
     def update_session_status(self, session_id: str, status: SessionStatus) -> None:
         """
@@ -464,15 +610,17 @@ class SessionManager:
             status (SessionStatus): The new status to assign.
         """
 
-        if session_id in self.sessions:
-            with self.session_locks[session_id]:
-                self.sessions[session_id].status = status
-                if status == SessionStatus.RUNNING and not self.sessions[session_id].started_at:
-                    self.sessions[session_id].started_at = datetime.now()
-                    logger.info(f"Session {session_id} status set to RUNNING, started_at {self.sessions[session_id].started_at}")
-                elif status in [SessionStatus.COMPLETED, SessionStatus.CANCELLED]:
-                    self.sessions[session_id].completed_at = datetime.now()
-                    logger.info(f"Session {session_id} status set to {status.value}, completed_at {self.sessions[session_id].completed_at}")
+        session = self.sessions.get(session_id)
+        if session:
+            with session.lock:
+                self._record_status_change(session_id, session.status, status)
+                session.status = status
+                if status == SessionStatus.RUNNING and not session.started_at:
+                    session.started_at = datetime.now()
+                    logger.info(f"Session {session_id} status set to RUNNING, started_at {session.started_at}")
+                elif status in TERMINAL_SESSION_STATUSES:
+                    session.completed_at = datetime.now()
+                    logger.info(f"Session {session_id} status set to {status.value}, completed_at {session.completed_at}")
 
 class SessionAwareDownloadExecutor:
     """
@@ -489,11 +637,23 @@ class SessionAwareDownloadExecutor:
 
         Parameters
             session_manager (SessionManager): The session manager to manage session states and downloads.
-            max_workers (int): Maximum number of concurrent workers (default is 3).
+            max_workers (int): Maximum number of concurrent workers per session (default is 3).
+
+        A single long-lived thread pool sized for the maximum concurrent sessions is created here,
+        capped at 32 threads so high session limits cannot blow up thread-stack memory; per-session
+        concurrency is bounded with a semaphore instead of a throwaway pool per session.
         """
 
         self.session_manager = session_manager
         self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(32, max_workers * session_manager.max_concurrent_sessions),
+            thread_name_prefix="download-worker")
+        self._last_queued_progress: Dict[Any, float] = {}
+        self._pending_progress: deque = deque()
+        self._progress_delta_threshold: float = 1.0
+        self._progress_flush_interval: float = 0.05
+        self._last_progress_flush: float = time.monotonic()
     
     def _completion_callback(self, session_id: str, item_id: str, file_path: str) -> None:
         """
@@ -505,14 +665,15 @@ class SessionAwareDownloadExecutor:
             file_path (str): Path of the completed downloaded file.
         """
 
+        self._flush_progress_updates()
         self.session_manager.update_download_item(session_id, item_id,
                                                   status=DownloadStatus.COMPLETED,
                                                   progress=100.0,
                                                   file_path=file_path)
-        logger.info(f"Download item {item_id} in session {session_id} marked as completed. File saved at {file_path}")
+        logger.info("Download item %s in session %s marked as completed. File saved at %s", item_id, session_id, file_path)
 
     def _download_with_session_context(self, session_id: str, item: DownloadItem,
-                                       download_function: Callable) -> bool:
+                                       download_function: Callable, ctx: Any = None) -> bool:
         """
         Execute a download task within the context of a session.
 
@@ -523,18 +684,15 @@ class SessionAwareDownloadExecutor:
                              progress_callback: Callable[[float], None],
                              error_callback: Callable[[str], None],
                              completion_callback: Callable[[str], None]],bool]) -> bool: Function to execute the actual download.
+            ctx (Any): Streamlit ScriptRunContext captured on the submitting thread, if available.
 
         Returns
             bool: True if the download succeeds, False otherwise.
         """
 
-        if get_script_run_ctx is not None:
-            ctx = get_script_run_ctx()
-        else:
-            ctx = None
-
         try:
             if ctx:
+                add_script_run_ctx, _ = get_script_run_ctx_helpers()
                 add_script_run_ctx(threading.current_thread(), ctx)
                 logger.info(f"ScriptRunContext added to thread for session {session_id}")
         except Exception as e:
@@ -543,7 +701,7 @@ class SessionAwareDownloadExecutor:
         try:
             self.session_manager.update_download_item(session_id, item.id,
                                                       status=DownloadStatus.DOWNLOADING)
-            logger.info(f"Download for {item.name} with ID {item.id} in session {session_id} started.")
+            logger.debug("Download for %s with ID %s in session %s started.", item.name, item.id, session_id)
 
             success: bool = download_function(
                 item,
@@ -551,7 +709,7 @@ class SessionAwareDownloadExecutor:
                 error_callback=lambda error: self._error_callback(session_id, item.id, error),
                 completion_callback=lambda file_path: self._completion_callback(session_id, item.id, file_path))
             status: str = "successful" if success else "failed"
-            logger.info(f"Download {status} for {item.name} with ID {item.id} in session {session_id}")
+            logger.info("Download %s for %s with ID %s in session %s", status, item.name, item.id, session_id)
             return success
 
         except Exception as e:
@@ -571,14 +729,39 @@ class SessionAwareDownloadExecutor:
             error (str): Error message describing the failure.
         """
 
+        self._flush_progress_updates()
         self.session_manager.update_download_item(session_id, item_id,
                                                   status=DownloadStatus.FAILED,
                                                   error_message=error)
         logger.error(f"Download item {item_id} in session {session_id} failed with error: {error}")
 
+    def _flush_progress_updates(self) -> None:
+        """
+        Drain the pending progress queue and apply the latest progress per item in one batch.
+
+        Updates queued by `_progress_callback` are deduplicated so that only the most recent
+        progress value per download item is written through to the session manager.
+        """
+
+        latest: Dict[Any, float] = {}
+        while True:
+            try:
+                session_id, item_id, progress = self._pending_progress.popleft()
+            except IndexError:
+                break
+            latest[(session_id, item_id)] = progress
+
+        for (session_id, item_id), progress in latest.items():
+            self.session_manager.update_download_item(session_id, item_id, progress=progress)
+
+        self._last_progress_flush = time.monotonic()
+
     def _progress_callback(self, session_id: str, item_id: str, progress: float) -> None:
         """
-        Update the progress of a download item.
+        Queue a progress update for a download item, coalescing bursts into batched writes.
+
+        Updates that move an item by less than `_progress_delta_threshold` percent are dropped
+        outright, so byte-level ticks from the downloader neither queue nor log anything.
 
         Parameters
             session_id (str): Identifier of the session.
@@ -586,8 +769,15 @@ class SessionAwareDownloadExecutor:
             progress (float): Percentage of completion for the download.
         """
 
-        self.session_manager.update_download_item(session_id, item_id, progress=progress)
-        logger.info(f"Progress of item {item_id} in session {session_id}: {progress}%")
+        key = (session_id, item_id)
+        last_queued = self._last_queued_progress.get(key, -1.0)
+        if progress < 100.0 and abs(progress - last_queued) < self._progress_delta_threshold:
+            return
+        self._last_queued_progress[key] = progress
+
+        self._pending_progress.append((session_id, item_id, progress))
+        if time.monotonic() - self._last_progress_flush >= self._progress_flush_interval:
+            self._flush_progress_updates()
 
     def execute_session_downloads(self, session_id: str,
                                   download_function: Callable,
@@ -618,33 +808,58 @@ class SessionAwareDownloadExecutor:
         logger.info(f"Session {session_id} status updated to RUNNING.")
 
         concurrent_downloads = max_concurrent_downloads or self.max_workers
-        try:
-            with ThreadPoolExecutor(max_workers=concurrent_downloads) as executor:
-                futures = []
-                for item in session.downloads:
-                    future = executor.submit(self._download_with_session_context,
-                                             session_id, item, download_function)
-                    futures.append(future)
-                    logger.info(f"Submitted download task for item {item.id} {item.name} in session {session_id}")
-
-                self.session_manager.active_futures[session_id] = futures
-
-                completed_count = 0
-                failed_count = 0
-
-                for future in as_completed(futures):
-                    try:
-                        result = future.result()
-                        if result:
-                            completed_count += 1
-                        else:
-                            failed_count += 1
-                    except Exception as e:
+        semaphore = threading.Semaphore(concurrent_downloads)
+        cancel_event = self.session_manager.cancel_events.get(session_id)
+        _, get_script_run_ctx = get_script_run_ctx_helpers()
+        ctx = get_script_run_ctx() if get_script_run_ctx is not None else None
+
+        def run_download(item: DownloadItem) -> bool:
+            try:
+                if cancel_event and cancel_event.is_set():
+                    logger.info(f"Skipping item {item.id} in session {session_id}: session cancelled.")
+                    return False
+                return self._download_with_session_context(session_id, item, download_function, ctx)
+            finally:
+                semaphore.release()
+
+        completed_count = 0
+        failed_count = 0
+        pending_count = len(session.downloads)
+        all_done = threading.Event()
+        count_lock = threading.Lock()
+
+        def record_result(future: Future) -> None:
+            nonlocal completed_count, failed_count, pending_count
+            with count_lock:
+                try:
+                    if future.result():
+                        completed_count += 1
+                    else:
                         failed_count += 1
-                        logger.error(f"Download task for session {session_id} failed during execution: {e}")
+                except Exception as e:
+                    failed_count += 1
+                    logger.error(f"Download task for session {session_id} failed during execution: {e}")
+                pending_count -= 1
+                if pending_count == 0:
+                    all_done.set()
 
-                self.session_manager.update_session_status(session_id, SessionStatus.COMPLETED)
-                logger.info(f"Session {session_id} completed. Completed: {completed_count}, Failed: {failed_count}")
+        try:
+            futures: Set[Future] = set()
+            self.session_manager.active_futures[session_id] = futures
+            for item in session.downloads:
+                semaphore.acquire()
+                future = self._executor.submit(run_download, item)
+                futures.add(future)
+                future.add_done_callback(record_result)
+                future.add_done_callback(futures.discard)
+                logger.debug("Submitted download task for item %s %s in session %s", item.id, item.name, session_id)
+
+            if session.downloads:
+                all_done.wait()
+
+            self._flush_progress_updates()
+            self.session_manager.update_session_status(session_id, SessionStatus.COMPLETED)
+            logger.info(f"Session {session_id} completed. Completed: {completed_count}, Failed: {failed_count}")
 
         except Exception as e:
             self.session_manager.update_session_status(session_id, SessionStatus.COMPLETED)
@@ -652,4 +867,6 @@ class SessionAwareDownloadExecutor:
             raise e
         finally:
             self.session_manager.active_futures.pop(session_id, None)
+            for key in [key for key in self._last_queued_progress if key[0] == session_id]:
+                del self._last_queued_progress[key]
             logger.info(f"Cleaned up active futures for session {session_id}")
\ No newline at end of file
@@ -1,11 +1,14 @@
 import asyncio
-import datetime
+import json
 import os
 import re
 import threading
-from google.youtube import download_audio_as_mp3, get_video_id, get_video_metadata, search_youtube
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
 from logging import basicConfig, getLogger, INFO
-from pandas import DataFrame, read_csv
+from pandas import concat, DataFrame, read_csv
 from streamlit import session_state
 from SessionManager import DownloadItem, DownloadSession
 from tagger import apply_metadata, recognize_music, search_shazam
@@ -17,6 +20,182 @@ logger = getLogger(__name__)
 DOWNLOADS_PATH = os.path.expanduser("~/Downloads")
 os.makedirs(DOWNLOADS_PATH, exist_ok=True)
 
+FILE_NAME_CLEAN_TABLE = bytes(c if chr(c).isalnum() else 0x20 for c in range(128)) + b' ' * 128
+METADATA_CACHE_PATH = os.path.join(DOWNLOADS_PATH, ".metadata_cache.json")
+METADATA_CACHE_TTL_SECONDS = 86400.0
+YOUTUBE_URL_PATTERN = re.compile(
+    r"^((?:https?:)?\/\/)?((?:www|m|music)\.)?((?:youtube(?:-nocookie)?\.com|youtu\.be))"
+    r"(\/(?:[\w\-]+\?v=|embed\/|live\/|v\/)?)([\w\-]+)(\S+)?$")
+
+_metadata_cache: Dict[str, Dict[str, Any]] = None
+_metadata_cache_lock = threading.Lock()
+
+def _cache_get(kind: str, key: str) -> Any:
+    """
+    Read a value from the on-disk metadata cache, loading the cache file on first use.
+
+    Parameters:
+        kind (str): Cache section, either 'search' or 'metadata'.
+        key (str): Key within the section.
+
+    Returns:
+        Any: The cached value, or None if absent or older than METADATA_CACHE_TTL_SECONDS.
+    """
+
+    global _metadata_cache
+    with _metadata_cache_lock:
+        if _metadata_cache is None:
+            try:
+                with open(METADATA_CACHE_PATH) as cache_file:
+                    _metadata_cache = json.load(cache_file)
+            except (OSError, ValueError):
+                _metadata_cache = {"metadata": {}, "search": {}}
+        entry = _metadata_cache.get(kind, {}).get(key)
+    if entry and time.time() - entry[0] < METADATA_CACHE_TTL_SECONDS:
+        return entry[1]
+    return None
+
+def _cache_put(kind: str, key: str, value: Any) -> None:
+    """
+    Store a value in the on-disk metadata cache. save_metadata_cache persists it.
+
+    Parameters:
+        kind (str): Cache section, either 'search' or 'metadata'.
+        key (str): Key within the section.
+        value (Any): JSON-serialisable value to store.
+    """
+
+    with _metadata_cache_lock:
+        _metadata_cache.setdefault(kind, {})[key] = [time.time(), value]
+
+def cached_search_youtube(query: str) -> str:
+    """
+    Resolve a YouTube search query to its top result URL, caching results on disk.
+
+    Parameters:
+        query (str): The search query.
+
+    Returns:
+        str: URL of the top search result.
+    """
+
+    from google.youtube import search_youtube
+
+    url = _cache_get("search", query)
+    if url is None:
+        url = search_youtube(query)[0]
+        _cache_put("search", query, url)
+    return url
+
+@lru_cache(maxsize=4096)
+def cached_video_id(url: str) -> str:
+    """
+    Extract the video ID from a YouTube URL, memoising results for repeated URLs.
+
+    Parameters:
+        url (str): The YouTube video URL.
+
+    Returns:
+        str: The video identifier.
+    """
+
+    from google.youtube import get_video_id
+
+    return get_video_id(url)
+
+def cached_video_metadata(video_id: str) -> Dict[str, Any]:
+    """
+    Fetch oembed metadata for a video, caching results on disk.
+
+    Parameters:
+        video_id (str): The YouTube video identifier.
+
+    Returns:
+        Dict[str, Any]: The video metadata.
+    """
+
+    from google.youtube import get_video_metadata
+
+    metadata = _cache_get("metadata", video_id)
+    if metadata is None:
+        metadata = get_video_metadata(video_id)
+        _cache_put("metadata", video_id, metadata)
+    return metadata
+
+def clear_metadata_cache() -> None:
+    """
+    Drop the in-memory metadata cache and delete the cache file.
+    """
+
+    global _metadata_cache
+    with _metadata_cache_lock:
+        _metadata_cache = {"metadata": {}, "search": {}}
+        try:
+            os.remove(METADATA_CACHE_PATH)
+        except OSError:
+            pass
+
+def save_metadata_cache() -> None:
+    """
+    Persist the in-memory metadata cache to METADATA_CACHE_PATH.
+    """
+
+    with _metadata_cache_lock:
+        if _metadata_cache is None:
+            return
+        try:
+            with open(METADATA_CACHE_PATH, "w") as cache_file:
+                json.dump(_metadata_cache, cache_file)
+        except OSError as e:
+            logger.warning("Could not persist metadata cache: %s", e)
+
+class TokenBucketRateLimiter:
+    """
+    Thread-safe token bucket that paces how often an operation may start.
+
+    Attributes:
+        capacity (float): Maximum number of tokens the bucket can hold.
+        rate (float): Tokens replenished per second.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.capacity = capacity
+        self.rate = rate
+        self._lock = threading.Lock()
+        self._tokens = capacity
+        self._updated_monotonic = time.monotonic()
+
+    def acquire(self) -> None:
+        """
+        Block until a token is available, then consume it.
+        """
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_monotonic) * self.rate)
+                self._updated_monotonic = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                wait_seconds = (1.0 - self._tokens) / self.rate
+            time.sleep(wait_seconds)
+
+DOWNLOAD_RATE_LIMITER = TokenBucketRateLimiter(rate=1.0)
+
+def clean_file_name(name: str) -> str:
+    """
+    Replace every non-alphanumeric character in a name with a space.
+
+    Parameters:
+        name (str): The raw name to sanitise.
+
+    Returns:
+        str: The sanitised name, safe for use as a file name.
+    """
+
+    return name.encode('ascii', errors='replace').translate(FILE_NAME_CLEAN_TABLE).decode('ascii')
+
 def download_shazams_with_session(shazams: DataFrame, session_name: str = None) -> str:
     """
     Process Shazam data and initiate downloads with session management.
@@ -42,26 +221,38 @@ def download_shazams_with_session(shazams: DataFrame, session_name: str = None)
         logger.info(f"Created session {session.session_id} for Shazam downloads.")
 
         logger.info("Searching YouTube URLs for Shazam tracks.")
-        shazams = shazams.assign(
-            url=lambda x: x.apply(lambda row: search_youtube(f"official {row['title']} {row['artist']} lyrics")[0], axis=1),
-            video_id=lambda x: x['url'].apply(get_video_id),
-            file_name=lambda x: x.apply(lambda row: f"{row['title']} {row['artist']} {row['video_id']}", axis=1))
-
-        for _, row in shazams.iterrows():
-            download_item = DownloadItem(
-                id=f"shazam_{row['video_id']}",
-                name=row['file_name'],
-                url=row['url'],
+        queries = [f"official {title} {artist} lyrics"
+                   for title, artist in zip(shazams['title'], shazams['artist'])]
+        query_keys = [' '.join(query.lower().split()) for query in queries]
+        unique_queries = {key: query for key, query in zip(query_keys, queries)}
+        with ThreadPoolExecutor(max_workers=min(16, max(1, len(unique_queries)))) as search_pool:
+            results = dict(zip(unique_queries,
+                               search_pool.map(cached_search_youtube, unique_queries.values())))
+        urls = [results[key] for key in query_keys]
+        save_metadata_cache()
+        video_ids = [cached_video_id(url) for url in urls]
+        file_names = [f"{title} {artist} {video_id}"
+                      for title, artist, video_id in zip(shazams['title'], shazams['artist'], video_ids)]
+        shazams = shazams.assign(url=urls, video_id=video_ids, file_name=file_names)
+
+        download_items = [
+            DownloadItem(
+                id=f"shazam_{video_id}",
+                name=file_name,
+                url=url,
                 metadata={
-                    "artist": row['artist'],
+                    "artist": artist,
                     "source": "shazam",
-                    "tags": search_shazam(term=f"{row['artist']} {row['title']}",
+                    "tags": search_shazam(term=f"{artist} {title}",
                                           types="songs"),
-                    "title": row['title'],
-                    "video_id": row['video_id'],
+                    "title": title,
+                    "video_id": video_id,
                 }
             )
-            session.add_download(download_item)
+            for title, artist, video_id, url, file_name in zip(
+                shazams['title'], shazams['artist'], shazams['video_id'],
+                shazams['url'], shazams['file_name'])]
+        session.add_downloads(download_items)
 
         download_thread = threading.Thread(
             target=session_state.download_executor.execute_session_downloads,
@@ -71,7 +262,6 @@ def download_shazams_with_session(shazams: DataFrame, session_name: str = None)
         download_thread.daemon = True
         download_thread.start()
         
-        session_state.progress_summary = session.get_progress_summary()
         session_state.current_session_id = session.session_id
         
         logger.info(f"Started downloads for session {session.session_id}")
@@ -100,50 +290,65 @@ def download_wrapper(item: DownloadItem, progress_callback, error_callback, comp
         Exception: Propagates unexpected errors that occur during the download process.
     """
     
+    from google.youtube import download_audio_as_mp3
+
     try:
-        if is_audio_downloaded(item.metadata['video_id']):
-            logger.info(f"Audio already exists for {item.name}")
-            file_path = find_existing_audio_path(item.metadata['video_id'])
+        video_id: str = item.metadata['video_id']
+        file_path = find_existing_audio_path(video_id)
+        if file_path:
+            logger.info("Audio already exists for %s", item.name)
             completion_callback(file_path)
             return True
-        
+
         progress_callback(50.0)
-        
-        logger.info(f"Downloading {item.name} from {item.url}")
-        download_audio_as_mp3(download_path=DOWNLOADS_PATH,
-                              file_name=item.name,
-                              url=item.url)
-        
+
+        with _pending_video_ids_lock:
+            if video_id in _pending_video_ids:
+                logger.info("Video %s is already being downloaded by another worker; skipping %s",
+                            video_id, item.name)
+                error_callback(f"Duplicate download in progress for video {video_id}")
+                return False
+            _pending_video_ids.add(video_id)
+        try:
+            DOWNLOAD_RATE_LIMITER.acquire()
+            logger.info("Downloading %s from %s", item.name, item.url)
+            download_audio_as_mp3(download_path=DOWNLOADS_PATH,
+                                  file_name=item.name,
+                                  url=item.url)
+        finally:
+            with _pending_video_ids_lock:
+                _pending_video_ids.discard(video_id)
+
         file_path: str = os.path.join(DOWNLOADS_PATH, f"{item.name}.mp3")
         if os.path.exists(file_path):
-            logger.info(f"{item.name} downloaded as {file_path}")
+            logger.info("%s downloaded as %s", item.name, file_path)
             completion_callback(file_path)
             tags: Dict[str, Any] = item.metadata.get("tags")
             if tags:
-                logger.info(f"Applying metadata found on the Shazam for the music {item.name}")
+                logger.info("Applying metadata found on the Shazam for the music %s", item.name)
                 apply_metadata(tags[0], file_path)
             else:
-                logger.info(f"Recognizing the music {item.name} using Shazam")
+                logger.info("Recognizing the music %s using Shazam", item.name)
                 result: Dict[str, Any] = asyncio.run(recognize_music(file_path))
                 if result:
-                    logger.info(f"Found a match for {item.name} as {result.get("url")}")
-                    term: str = f"{result.get("subtitle")} {result.get("title")}"
+                    logger.info("Found a match for %s as %s", item.name, result.get("url"))
+                    term: str = f"{result.get('subtitle')} {result.get('title')}"
                     item.metadata["tags"] = search_shazam(term, "songs")
                     tags: Dict[str, Any] = item.metadata.get("tags")
                     if tags:
-                        logger.info(f"Applying metadata found on the Shazam for the music {item.name}")
+                        logger.info("Applying metadata found on the Shazam for the music %s", item.name)
                         apply_metadata(tags[0], file_path)
                 else:
-                    logger.warning(f"No metadata found for {item.name}")
+                    logger.warning("No metadata found for %s", item.name)
                     item.metadata["tags"] = None
-                    logger.warning(f"Failed to apply metadata to {item.name} using Shazam.")
+                    logger.warning("Failed to apply metadata to %s using Shazam.", item.name)
             return True
         else:
             error_callback(f"Download completed but file not found: {file_path}")
             return False
         
     except Exception as e:
-        logger.error(f"Download failed for {item.name}: {str(e)}")
+        logger.error("Download failed for %s: %s", item.name, e)
         error_callback(str(e))
         return False
 
@@ -171,29 +376,33 @@ def download_youtube_with_session(urls: DataFrame, session_name: str = None) ->
         
         logger.info(f"Created session {session.session_id} for YouTube downloads.")
 
-        urls = (urls.assign(video_id=lambda x: x['url'].apply(get_video_id))
-        .drop_duplicates(subset=['video_id'])
-        .assign(metadata=lambda x: x['video_id'].apply(get_video_metadata),
-                name=lambda x: x.apply(lambda row: re.sub(
-                    r'[^a-zA-Z0-9]',
-                    ' ',
-                    f"{row['metadata'].get('title')} {row['metadata'].get('author_name')}"
-                ) + f" {row['video_id']}",
-                axis=1)))
-
-        for _, row in urls.iterrows():
-            download_item = DownloadItem(
-                id=f"youtube_{row['video_id']}",
-                name=row['name'],
-                url=row['url'],
+        urls = (urls.assign(video_id=urls['url'].map(cached_video_id))
+        .drop_duplicates(subset=['video_id']))
+
+        video_ids = list(urls['video_id'])
+        with ThreadPoolExecutor(max_workers=min(16, max(1, len(video_ids)))) as metadata_pool:
+            metadata_list = list(metadata_pool.map(cached_video_metadata, video_ids))
+        save_metadata_cache()
+
+        names = [clean_file_name(f"{metadata.get('title')} {metadata.get('author_name')}") + f" {video_id}"
+                 for metadata, video_id in zip(metadata_list, video_ids)]
+        urls = urls.assign(metadata=metadata_list, name=names)
+
+        download_items = [
+            DownloadItem(
+                id=f"youtube_{video_id}",
+                name=name,
+                url=url,
                 metadata={
-                    "video_id": row['video_id'],
-                    "title": row['metadata'].get('title'),
-                    "author": row['metadata'].get('author_name'),
+                    "video_id": video_id,
+                    "title": metadata.get('title'),
+                    "author": metadata.get('author_name'),
                     "source": "youtube"
                 }
             )
-            session.add_download(download_item)
+            for video_id, name, url, metadata in zip(
+                urls['video_id'], urls['name'], urls['url'], urls['metadata'])]
+        session.add_downloads(download_items)
 
         download_thread = threading.Thread(
             target=session_state.download_executor.execute_session_downloads,
@@ -202,7 +411,6 @@ def download_youtube_with_session(urls: DataFrame, session_name: str = None) ->
         download_thread.daemon = True
         download_thread.start()
         
-        session_state.progress_summary = session.get_progress_summary()
         session_state.current_session_id = session.session_id
         
         logger.info(f"Started downloads for session {session.session_id}")
@@ -229,10 +437,16 @@ def extract_shazams(file_path: str) -> DataFrame:
     logger.info(f"Extracting Shazam data from: {file_path}")
 
     try:
-        return (read_csv(filepath_or_buffer=file_path)
-            .drop_duplicates(subset=["artist", "title"])
-            .drop(columns=["date", "latitude", "longitude", "status"], errors="ignore")
-            .sort_values(by=["artist", "title"]))
+        kept_chunks = []
+        seen_tracks = set()
+        for chunk in read_csv(filepath_or_buffer=file_path, chunksize=100_000):
+            chunk = (chunk.drop_duplicates(subset=["artist", "title"])
+                     .drop(columns=["date", "latitude", "longitude", "status"], errors="ignore"))
+            keys = list(zip(chunk["artist"], chunk["title"]))
+            unseen = [key not in seen_tracks for key in keys]
+            seen_tracks.update(keys)
+            kept_chunks.append(chunk.loc[unseen])
+        return concat(kept_chunks, ignore_index=True).sort_values(by=["artist", "title"])
     except Exception as e:
         logger.error(f"Failed to extract Shazam data: {str(e)}")
         raise Exception(f"Failed to extract Shazam data: {str(e)}")
@@ -248,14 +462,12 @@ def extract_youtube_urls(file_path: str) -> DataFrame:
         DataFrame: A DataFrame containing the unique YouTube URLs.
     """
 
-    YOUTUBE_URL_PATTERN = r"^((?:https?:)?\/\/)?((?:www|m|music)\.)?((?:youtube(?:-nocookie)?\.com|youtu\.be))(\/(?:[\w\-]+\?v=|embed\/|live\/|v\/)?)([\w\-]+)(\S+)?$"
-
     logger.info(f"Extracting and validating YouTube URLs from: {file_path}")
 
     try:
-        return (read_csv(filepath_or_buffer=file_path)
+        return (read_csv_fast(file_path)
         .assign(url=lambda df: df["url"].astype(str).str.strip())
-        .loc[lambda df: df["url"].apply(lambda u: bool(re.match(YOUTUBE_URL_PATTERN, u)))]
+        .loc[lambda df: df["url"].str.match(YOUTUBE_URL_PATTERN)]
         .drop_duplicates(subset=["url"])
         .sort_values(by=["url"])
         .reset_index(drop=True))
@@ -263,6 +475,63 @@ def extract_youtube_urls(file_path: str) -> DataFrame:
         logger.error(f"Failed to extract YouTube URLs: {str(e)}")
         raise Exception(f"Failed to extract YouTube URLs: {str(e)}")
 
+def read_csv_fast(file_path: str) -> DataFrame:
+    """
+    Read a CSV file with the multithreaded pyarrow engine when available, falling back to the
+    default pandas engine otherwise.
+
+    Parameters:
+        file_path (str): Path to the CSV file.
+
+    Returns:
+        DataFrame: The parsed CSV contents.
+    """
+
+    try:
+        return read_csv(filepath_or_buffer=file_path, engine="pyarrow")
+    except (ImportError, ValueError):
+        return read_csv(filepath_or_buffer=file_path)
+
+_audio_index: Dict[str, str] = {}
+_audio_index_lock = threading.Lock()
+_audio_index_mtime: float = -1.0
+_pending_video_ids = set()
+_pending_video_ids_lock = threading.Lock()
+
+def build_downloaded_audio_index() -> Dict[str, str]:
+    """
+    Map the video ID of every MP3 file in DOWNLOADS_PATH to its full path.
+
+    The index is cached at module level and only rebuilt when the directory's mtime changes, so
+    repeated lookups within a session cost one stat call instead of a full scan.
+
+    Returns:
+        Dict[str, str]: Mapping of video ID to the path of its downloaded MP3 file.
+    """
+
+    global _audio_index, _audio_index_mtime
+    try:
+        directory_mtime: float = os.stat(DOWNLOADS_PATH).st_mtime
+    except OSError as e:
+        logger.error("Error scanning downloaded audio files: %s", e)
+        return {}
+
+    with _audio_index_lock:
+        if directory_mtime != _audio_index_mtime:
+            index: Dict[str, str] = {}
+            try:
+                with os.scandir(DOWNLOADS_PATH) as entries:
+                    for entry in entries:
+                        if entry.name.endswith('.mp3'):
+                            file_video_id: str = entry.name.rpartition(' ')[2][:-4]
+                            index[file_video_id] = entry.path
+            except Exception as e:
+                logger.error("Error scanning downloaded audio files: %s", e)
+                return _audio_index
+            _audio_index = index
+            _audio_index_mtime = directory_mtime
+        return _audio_index
+
 def find_existing_audio_path(video_id: str) -> str:
     """
     Search for an existing audio file (.mp3) matching the given YouTube video ID.
@@ -274,17 +543,10 @@ def find_existing_audio_path(video_id: str) -> str:
         str | None: Full path to the matching MP3 file if found, otherwise None.
     """
 
-    try:
-        for filename in os.listdir(DOWNLOADS_PATH):
-            if filename.endswith('.mp3'):
-                file_video_id: str = filename[:-4].split()[-1]
-                if file_video_id == video_id:
-                    file_path = os.path.join(DOWNLOADS_PATH, filename)
-                    logger.info(f"Found audio file for video_id {video_id} at {file_path}")
-                    return file_path
-    except Exception as e:
-        logger.error(f"Error searching audio path: {str(e)}")
-    return None
+    file_path = build_downloaded_audio_index().get(video_id)
+    if file_path:
+        logger.info("Found audio file for video_id %s at %s", video_id, file_path)
+    return file_path
 
 def is_audio_downloaded(video_id: str) -> bool:
     """
@@ -297,14 +559,7 @@ def is_audio_downloaded(video_id: str) -> bool:
         bool: True if the video is found, False otherwise.
     """
 
-    try:
-        for filename in os.listdir(DOWNLOADS_PATH):
-            if filename.endswith('.mp3'):
-                file_video_id: str = filename[:-4].split()[-1]
-                if file_video_id == video_id:
-                    return True
-        logger.info(f"No existing audio found for video_id {video_id}")
-        return False
-    except Exception as e:
-        logger.error(f"Error checking audio for video_id {video_id}: {str(e)}")
-        return False
\ No newline at end of file
+    if video_id in build_downloaded_audio_index():
+        return True
+    logger.info(f"No existing audio found for video_id {video_id}")
+    return False
\ No newline at end of file
@@ -7,6 +7,7 @@ A web-based application to download music identified by Shazam or from YouTube w
 import os
 import zipfile
 from datetime import datetime
+from functools import lru_cache
 from downloader import (download_shazams_with_session, download_youtube_with_session, DOWNLOADS_PATH, extract_shazams,
                         extract_youtube_urls)
 from pandas import DataFrame
@@ -26,16 +27,22 @@ def cancel_session(session_id: str) -> bool:
             session_state.progress_summary = session.get_progress_summary()
     return success
 
-def colored_metric(label, value, delta=None, color="black"):
+METRIC_TEMPLATE = """
+    <div style='text-align:center;'>
+        <div>{label}</div>
+        <div style='font-size:28px; font-weight:bold;'>{value}</div>
+        <div style='font-size:18px;'>{delta}</div>
+    </div>
+"""
+
+@lru_cache(maxsize=256)
+def metric_html(label, value, delta, color) -> str:
     delta_coloured = f'<span style="color:{color}; font-weight:bold;">{delta}</span>' if delta else ''
-    valu_coloured = f'<span style="color:{color}; font-weight:bold;">{value}</span>'
-    markdown(f"""
-        <div style='text-align:center;'>
-            <div>{label}</div>
-            <div style='font-size:28px; font-weight:bold;'>{valu_coloured}</div>
-            <div style='font-size:18px;'>{delta_coloured}</div>
-        </div>
-    """, unsafe_allow_html=True)
+    value_coloured = f'<span style="color:{color}; font-weight:bold;">{value}</span>'
+    return METRIC_TEMPLATE.format(label=label, value=value_coloured, delta=delta_coloured)
+
+def colored_metric(label, value, delta=None, color="black"):
+    markdown(metric_html(label, value, delta, color), unsafe_allow_html=True)
 
 def create_archive(download_session: DownloadSession, session_id: str):
     downloads: List[Dict] = []
@@ -1,14 +1,118 @@
-import mimetypes
+import asyncio
+import os
+import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from hashlib import sha256
 from logging import basicConfig, getLogger, INFO
-from mutagen.id3 import APIC, ID3, TALB, TCOM, TCON, TDRC, TIT2, TPE1, TRCK
-from mutagen.mp3 import MP3
+from mutagen import MutagenError
+from mutagen.id3 import APIC, ID3, ID3NoHeaderError, TALB, TCOM, TCON, TDRC, TIT2, TPE1, TRCK, TXXX
+from requests.adapters import HTTPAdapter
 from shazamio import Shazam
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+from urllib3.util import Retry
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
 
 basicConfig(level=INFO)
 logger = getLogger(__name__)
 
+ARTWORK_DIMENSION_PATTERN = re.compile(r"\{[wh]\}")
+HTTP_TIMEOUT = (3.05, 10)
+
+HTTP_SESSION = requests.Session()
+HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=10,
+                                           pool_maxsize=32,
+                                           max_retries=Retry(total=3,
+                                                             backoff_factor=0.3,
+                                                             status_forcelist=(429, 500, 502, 503, 504))))
+
+ARTWORK_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="artwork-fetch")
+ARTWORK_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "music-downloader", "artwork")
+
+SHAZAM_SEARCH_URL = "https://www.shazam.com/services/amapi/v1/catalog/{country_code}/search"
+VALID_SEARCH_TYPES = frozenset({"songs", "artists"})
+SHAZAM_SEARCH_HEADERS: Dict[str, str] = {
+    "sec-ch-ua-platform": '"Windows"',
+    "Referer": "https://www.shazam.com/",
+    "sec-ch-ua": '"Chromium";v="140", "Not=A?Brand";v="24", "Microsoft Edge";v="140"',
+    "sec-ch-ua-mobile": "?0",
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/140.0.0.0 Safari/537.36 Edg/140.0.0.0"
+    ),
+    "Accept": "application/json",
+    "DNT": "1",
+    "Content-Type": "application/json"}
+
+def sniff_image_mime(image_data: bytes) -> str:
+    """
+    Identify an image's MIME type from its magic bytes.
+
+    Parameters
+        image_data (bytes): The raw image bytes.
+
+    Returns
+        str: The detected MIME type, defaulting to 'image/jpeg'.
+    """
+
+    if image_data[:8] == b'\x89PNG\r\n\x1a\n':
+        return 'image/png'
+    if image_data[:4] == b'RIFF' and image_data[8:12] == b'WEBP':
+        return 'image/webp'
+    return 'image/jpeg'
+
+@lru_cache(maxsize=64)
+def fetch_artwork(artwork_url: str) -> Tuple[bytes, str]:
+    """
+    Download cover art and determine its MIME type. Results are memoised per URL, so every track
+    of an album reuses the bytes fetched for the first one, and cached on disk alongside the
+    server's ETag so later runs revalidate with If-None-Match instead of re-downloading.
+
+    Parameters
+        artwork_url (str): URL of the cover art image.
+
+    Returns
+        Tuple[bytes, str]: The image bytes and their MIME type.
+    """
+
+    image_path = os.path.join(ARTWORK_CACHE_PATH, sha256(artwork_url.encode()).hexdigest())
+    etag_path = image_path + ".etag"
+    headers = None
+    try:
+        with open(etag_path) as etag_file:
+            cached_etag = etag_file.read().strip()
+        if cached_etag and os.path.exists(image_path):
+            headers = {"If-None-Match": cached_etag}
+    except OSError:
+        pass
+
+    response = HTTP_SESSION.get(artwork_url, headers=headers, timeout=HTTP_TIMEOUT)
+    if headers and response.status_code == 304:
+        logger.info("Artwork unchanged on server; using cached copy")
+        with open(image_path, 'rb') as image_file:
+            image_data = image_file.read()
+        return image_data, sniff_image_mime(image_data)
+    response.raise_for_status()
+
+    etag = response.headers.get("ETag")
+    if etag:
+        try:
+            os.makedirs(ARTWORK_CACHE_PATH, exist_ok=True)
+            with open(image_path, 'wb') as image_file:
+                image_file.write(response.content)
+            with open(etag_path, 'w') as etag_file:
+                etag_file.write(etag)
+        except OSError as e:
+            logger.warning("Could not write artwork cache: %s", e)
+
+    return response.content, sniff_image_mime(response.content)
+
 def apply_metadata(metadata: dict, audio_file_path: str) -> None:
     """
     Apply metadata and cover art from Apple Music-style dictionary to an audio file.
@@ -21,7 +125,7 @@ def apply_metadata(metadata: dict, audio_file_path: str) -> None:
         ValueError: If the audio file format is unsupported.
     """
 
-    logger.info(f"Applying metadata to file: {audio_file_path}")
+    logger.info("Applying metadata to file: %s", audio_file_path)
     attributes = metadata.get('attributes', {})
 
     title = attributes.get('name')
@@ -36,63 +140,110 @@ def apply_metadata(metadata: dict, audio_file_path: str) -> None:
     artwork = attributes.get('artwork', {})
     height = artwork.get('height')
     width = artwork.get('width')
-    artwork_url = artwork.get('url').replace('{w}', str(width)).replace('{h}', str(height))
+    raw_artwork_url = artwork.get('url')
+    artwork_url = ARTWORK_DIMENSION_PATTERN.sub(
+        lambda match: str(width) if match.group() == '{w}' else str(height),
+        raw_artwork_url) if raw_artwork_url else None
 
-    audio = MP3(audio_file_path, ID3=ID3)
-    if audio is None:
-        logger.error("Unsupported audio format or file not found")
-        raise ValueError("Unsupported audio format or file not found")
-    
-    if audio.tags:
-        logger.info("Deleting existing tags")
-        audio.delete()
-        audio.save()
-        audio = MP3(audio_file_path, ID3=ID3)
     try:
-        tags = audio.tags
-    except Exception as e:
-        logger.warning(f"Could not access tags: {e}")
-
-    if title:
-        logger.info(f"Setting title: {title}")
-        tags.add(TIT2(encoding=3, text=title))
-    if artist:
-        logger.info(f"Setting artist: {artist}")
-        tags.add(TPE1(encoding=3, text=artist))
-    if album:
-        logger.info(f"Setting album: {album}")
-        tags.add(TALB(encoding=3, text=album))
-    if genre:
-        logger.info(f"Setting genre: {genre}")
-        tags.add(TCON(encoding=3, text=genre))
-    if track_number:
-        logger.info(f"Setting track number: {track_number}")
-        tags.add(TRCK(encoding=3, text=str(track_number)))
-    if release_date:
-        logger.info(f"Setting release date: {release_date}")
-        tags.add(TDRC(encoding=3, text=release_date))
-    if composer:
-        logger.info(f"Setting composer: {composer}")
-        tags.add(TCOM(encoding=3, text=composer))
-    
-    if artwork_url:
-        logger.info(f"Downloading artwork from {artwork_url}")
+        tags = ID3(audio_file_path)
+    except ID3NoHeaderError:
+        tags = ID3()
+    except MutagenError as e:
+        logger.error("Unsupported audio format or file not found")
+        raise ValueError("Unsupported audio format or file not found") from e
+
+    art_source = tags.getall("TXXX:ArtSrc")
+    artwork_unchanged = bool(artwork_url and art_source and art_source[0].text
+                             and art_source[0].text[0] == artwork_url and tags.getall("APIC"))
+    artwork_future = None
+    if artwork_url and not artwork_unchanged:
+        artwork_future = ARTWORK_EXECUTOR.submit(fetch_artwork, artwork_url)
+        logger.info("Downloading artwork from %s", artwork_url)
+    elif artwork_unchanged:
+        logger.info("Embedded artwork already matches the source URL; skipping download")
+
+    if tags:
+        logger.info("Clearing existing tags")
+        frame_keys = ["TIT2", "TPE1", "TALB", "TCON", "TRCK", "TDRC", "TCOM", "TXXX:ArtSrc"]
+        if not artwork_unchanged:
+            frame_keys.append("APIC")
+        for frame_key in frame_keys:
+            tags.delall(frame_key)
+
+    frame_values = (("title", title, TIT2),
+                    ("artist", artist, TPE1),
+                    ("album", album, TALB),
+                    ("genre", genre, TCON),
+                    ("track number", track_number, TRCK),
+                    ("release date", release_date, TDRC),
+                    ("composer", composer, TCOM))
+    for label, value, frame_class in frame_values:
+        if value:
+            logger.debug("Setting %s: %s", label, value)
+            tags.add(frame_class(encoding=3, text=str(value)))
+
+    if artwork_future:
         try:
-            response = requests.get(artwork_url)
-            response.raise_for_status()
-            image_data = response.content
-            mime_type = mimetypes.guess_type(artwork_url)[0] or 'image/jpeg'
+            image_data, mime_type = artwork_future.result()
             tags.add(APIC(encoding=3,
                           mime=mime_type,
                           type=3,
                           desc='Cover',
                           data=image_data))
         except Exception as e:
-            logger.warning(f"Failed to download or embed artwork: {e}")
+            logger.warning("Failed to download or embed artwork: %s", e)
+
+    if artwork_url:
+        tags.add(TXXX(encoding=3, desc='ArtSrc', text=artwork_url))
 
-    audio.save()
+    tags.save(audio_file_path, v2_version=3)
     logger.info("Metadata applied and file saved.")
 
+@lru_cache(maxsize=512)
+def _search_shazam_request(term: str, types: str, limit: int, country_code: str) -> List[Dict[str, Any]]:
+    """
+    Issue the Shazam catalog search request and extract the result data. Successful responses are
+    memoised per argument tuple, so repeated searches for the same term skip the network entirely;
+    failures raise and are therefore never cached.
+
+    Parameters
+        term (str): The search term such as a song name or artist name.
+        types (str): The type of search. Allowed values: 'artists', 'songs'.
+        limit (int): The number of search results to return.
+        country_code (str): The country/region code for the catalog.
+
+    Returns
+        List[Dict[str, Any]]: The extracted result data, or None when the response carries none.
+    """
+
+    params: Dict[str, str] = {"types": types,
+                              "term": term,
+                              "limit": str(limit)}
+
+    url: str = SHAZAM_SEARCH_URL.format(country_code=country_code)
+
+    response = HTTP_SESSION.get(url, params=params, headers=SHAZAM_SEARCH_HEADERS, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    json_response: Dict = json_loads(response.content) if response.content else {}
+
+    return json_response.get("results", {}).get(types, {}).get("data")
+
+async def apply_metadata_async(metadata: dict, audio_file_path: str) -> None:
+    """
+    Apply metadata from a coroutine without blocking the event loop; the blocking tag and artwork
+    work runs on a worker thread via asyncio.to_thread.
+
+    Parameters
+        metadata (dict): Metadata dictionary in Apple Music API style.
+        audio_file_path (str): Path to the audio file where metadata should be applied.
+
+    Raises
+        ValueError: If the audio file format is unsupported.
+    """
+
+    await asyncio.to_thread(apply_metadata, metadata, audio_file_path)
+
 def search_shazam(term: str, types: str, limit: int = 1, country_code: str = "IN") -> List[Dict[str, Any]]:
     """
     Perform a search query on the Shazam API.
@@ -112,51 +263,53 @@ def search_shazam(term: str, types: str, limit: int = 1, country_code: str = "IN
     """
 
     logger.info(f"Searching Shazam for term='{term}', type='{types}', limit={limit}, country_code='{country_code}'")
-    if types not in {"songs", "artists"}:
+    if types not in VALID_SEARCH_TYPES:
         logger.error(f"Invalid value for parameter 'types': {types}.")
         raise ValueError("Parameter 'types' must be either 'artists' or 'songs'.")
 
-    headers: Dict[str, str] = {
-        "sec-ch-ua-platform": '"Windows"',
-        "Referer": "https://www.shazam.com/",
-        "sec-ch-ua": '"Chromium";v="140", "Not=A?Brand";v="24", "Microsoft Edge";v="140"',
-        "sec-ch-ua-mobile": "?0",
-        "User-Agent": (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/140.0.0.0 Safari/537.36 Edg/140.0.0.0"
-        ),
-        "Accept": "application/json",
-        "DNT": "1",
-        "Content-Type": "application/json"}
-
-    params: Dict[str, str] = {"types": types,
-                              "term": term,
-                              "limit": str(limit)}
-
-    url: str = f"https://www.shazam.com/services/amapi/v1/catalog/{country_code}/search"
-
     try:
-        response = requests.get(url, params=params, headers=headers)
-        response.raise_for_status()
-        json_response: Dict = response.json() or {}
-        
-        data = json_response.get("results", {}).get(types, {}).get("data")
+        data = _search_shazam_request(term, types, limit, country_code)
         if data is not None:
             return data
         logger.warning(f"No data found for {types} {term} in response.")
         return []
     except (ValueError, KeyError, TypeError) as e:
         logger.warning(f"Failed to parse JSON or extract data for {types} {term}: {e}")
+        return []
     except requests.exceptions.RequestException as e:
         logger.exception(f"Shazam API request failed: {e}")
+        return []
+
+def search_shazam_many(terms: List[str], types: str, limit: int = 1,
+                       country_code: str = "IN") -> List[List[Dict[str, Any]]]:
+    """
+    Search Shazam for several terms concurrently.
+
+    Parameters
+        terms (List[str]): The search terms such as song names or artist names.
+        types (str): The type of search. Allowed values: 'artists', 'songs'.
+        limit (int): The number of search results to return per term. Default is 1.
+        country_code (str): The country/region code for the catalog. Default is 'IN'.
+
+    Returns
+        List{List[Dict[str, Any]]}: Search results per term, in input order.
+
+    Raises
+        ValueError: If an invalid `types` parameter is passed.
+    """
+
+    if not terms:
+        return []
+    with ThreadPoolExecutor(max_workers=min(8, len(terms))) as executor:
+        return list(executor.map(lambda term: search_shazam(term, types, limit, country_code), terms))
 
-async def recognize_music(file_path: str) -> Dict[str, Any]:
+async def recognize_music(file_path: str, shazam: Shazam = None) -> Dict[str, Any]:
     """
     Recognise a music by analysing a local audio file using Shazamio.
 
     Parameters
         file_path (str): The path to the audio file.
+        shazam (Shazam): Optional client to reuse across calls; one is created when omitted.
 
     Returns
         List[Dict[str, Any]]: List containing recognised music information.
@@ -164,7 +317,7 @@ async def recognize_music(file_path: str) -> Dict[str, Any]:
 
     logger.info(f"Recognising music from file: {file_path}")
     try:
-        shazam = Shazam()
+        shazam = shazam or Shazam()
         result = await shazam.recognize(file_path)
         if result:
             return result.get("track")
@@ -172,4 +325,25 @@ async def recognize_music(file_path: str) -> Dict[str, Any]:
         return
     except Exception as e:
         logger.error(f"Error recognising music: {e}")
-        return
\ No newline at end of file
+        return
+
+async def recognize_music_many(file_paths: List[str], concurrency: int = 8) -> List[Dict[str, Any]]:
+    """
+    Recognise several audio files concurrently, sharing one Shazam client.
+
+    Parameters
+        file_paths (List[str]): Paths of the audio files to recognise.
+        concurrency (int): Maximum number of recognitions in flight. Default is 8.
+
+    Returns
+        List[Dict[str, Any]]: Recognised music information per file, in input order.
+    """
+
+    shazam = Shazam()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def recognize_one(file_path: str) -> Dict[str, Any]:
+        async with semaphore:
+            return await recognize_music(file_path, shazam=shazam)
+
+    return list(await asyncio.gather(*(recognize_one(file_path) for file_path in file_paths)))